@@ -8,6 +8,22 @@ export async function checkHealth(): Promise<HealthResponse> {
   return response.json();
 }
 
+function parseSSEData(data: string): SSEEvent | null {
+  // The backend tags frames: `T:<text>` is a raw thought (no JSON on the
+  // hot event class), `J:<json>` is a structured event. Untagged frames
+  // are plain JSON, kept for back-compat.
+  if (data.startsWith('T:')) {
+    return { type: 'thought', data: data.slice(2) } as SSEEvent;
+  }
+  const body = data.startsWith('J:') ? data.slice(2) : data;
+  try {
+    return JSON.parse(body) as SSEEvent;
+  } catch (e) {
+    console.error('Failed to parse SSE event:', e);
+    return null;
+  }
+}
+
 export async function* streamReconciliation(file: File): AsyncGenerator<SSEEvent> {
   const formData = new FormData();
   formData.append('file', file);
@@ -36,11 +52,8 @@ export async function* streamReconciliation(file: File): AsyncGenerator<SSEEvent
       if (line.startsWith('data: ')) {
         const data = line.slice(6);
         if (data === '[DONE]') return;
-        try {
-          yield JSON.parse(data) as SSEEvent;
-        } catch (e) {
-          console.error('Failed to parse SSE event:', e);
-        }
+        const event = parseSSEData(data);
+        if (event) yield event;
       }
     }
   }
@@ -70,11 +83,8 @@ export async function* streamVisualization(): AsyncGenerator<SSEEvent> {
       if (line.startsWith('data: ')) {
         const data = line.slice(6);
         if (data === '[DONE]') return;
-        try {
-          yield JSON.parse(data) as SSEEvent;
-        } catch (e) {
-          console.error('Failed to parse SSE event:', e);
-        }
+        const event = parseSSEData(data);
+        if (event) yield event;
       }
     }
   }
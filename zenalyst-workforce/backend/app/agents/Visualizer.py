@@ -19,20 +19,29 @@ Priority charts (per Zenalyst design brief):
 from __future__ import annotations
 
 import json
+import math
 import os
 import re
 from typing import Generator
 
 import pandas as pd
-from groq import Groq
 
 import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tools"))
 from app.tools.executor import safe_exec_viz  # noqa: E402
+from app.tools import llm_cache  # noqa: E402
+
+# Shared, pooled client — keep-alive connections reused across all agents
+from app.clients import client as _client  # noqa: E402
 
-_client = Groq()
 _MODEL  = "llama-3.3-70b-versatile"
 
+# Emit a streaming-progress thought roughly every this many response chars
+_STREAM_TICK_CHARS = 240
+
+# Raw LLM-response echoes double SSE payload per run — opt in via ZEN_DEBUG
+_DEBUG = bool(os.environ.get("ZEN_DEBUG"))
+
 _SYSTEM_PROMPT = """
 You are ZenView, a deterministic financial visualization agent.
 Your ONLY job is to write Python visualization code using `plt` and `sns`.
@@ -51,29 +60,43 @@ STRICT RULES — violating any of these will crash the system:
    b. Bar chart of Amount by Category sorted descending
    c. Line chart of Amount over Date if date column is present
    d. Heatmap if 3+ numeric columns
+
+YOUR TASK (same every request — only the DataFrame metadata changes):
+SAVE_PATH is already defined as an absolute path — use it directly.
+Write professional matplotlib/seaborn visualization code following the
+priority order above. Create the BEST chart that tells a financial story.
+For pie/bar charts use the aggregated group sums from df.groupby().
+The chart must have a clear title, axis labels, and a legend if applicable.
+Return ONLY the ```python block.
 """
 
 
-def _build_prompt(df: pd.DataFrame) -> str:
-    """Build a fully grounded prompt from actual DataFrame metadata."""
-    numeric_cols = df.select_dtypes(include="number").columns.tolist()
-    cat_cols     = df.select_dtypes(include=["object", "category"]).columns.tolist()
-    date_cols    = [c for c in df.columns if "date" in c.lower() or "time" in c.lower()]
+def _build_prompt(
+    df: pd.DataFrame,
+    numeric_cols: list[str],
+    cat_cols: list[str],
+    date_cols: list[str],
+) -> str:
+    """
+    Build a fully grounded prompt from actual DataFrame metadata.
 
-    # Safe numeric summary — LLM sees real ranges, not guesses
-    num_summary = {}
-    for col in numeric_cols[:4]:
-        num_summary[col] = {
-            "min":  round(float(df[col].min()), 2),
-            "max":  round(float(df[col].max()), 2),
-            "sum":  round(float(df[col].sum()), 2),
-            "mean": round(float(df[col].mean()), 2),
-        }
+    Dynamic content only — the static task spec sits in _SYSTEM_PROMPT so the
+    byte-identical system message stays the provider-cacheable prefix. Column
+    role lists are computed once in run_zenview and passed in rather than
+    re-walking the block manager here.
+    """
+    # Safe numeric summary — LLM sees real ranges, not guesses.
+    # One vectorized .agg() pass over the selected columns instead of four
+    # separate full-column reductions per column.
+    num_summary: dict = {}
+    if numeric_cols:
+        agg = df[numeric_cols[:4]].agg(["min", "max", "sum", "mean"]).round(2)
+        num_summary = {col: agg[col].to_dict() for col in agg.columns}
 
     # Categorical value counts (top 8)
     cat_summary = {}
     for col in cat_cols[:3]:
-        cat_summary[col] = df[col].value_counts().head(8).to_dict()
+        cat_summary[col] = df[col].value_counts(dropna=False).head(8).to_dict()
 
     return f"""
 The DataFrame `df` is now clean and available.
@@ -90,19 +113,16 @@ Numeric summary (real values — use these, never hardcode numbers):
 Category value counts (real values):
 {json.dumps(cat_summary, indent=2, default=str)}
 
-SAVE_PATH is already defined as an absolute path — use it directly.
-
-Your task:
-Write professional matplotlib/seaborn visualization code following the priority
-order in your system prompt. Create the BEST chart that tells a financial story.
-For pie/bar charts use the aggregated group sums from df.groupby().
-The chart must have a clear title, axis labels, and a legend if applicable.
-Return ONLY the ```python block.
+Perform your visualization task from your instructions on this DataFrame now.
 """
 
 
+_CODE_FENCE_RE = re.compile(r"```python\s*(.*?)```", re.DOTALL)
+_IMPORT_RE     = re.compile(r"^\s*(import |from )")
+
+
 def _extract_code(response: str) -> str:
-    match = re.search(r"```python\s*(.*?)```", response, re.DOTALL)
+    match = _CODE_FENCE_RE.search(response)
     if not match:
         raise ValueError(
             f"ZenView: LLM did not return a ```python block.\n"
@@ -119,8 +139,7 @@ def _sanitize_code(code: str) -> str:
     """
     lines = []
     for line in code.splitlines():
-        stripped = line.strip()
-        if stripped.startswith("import ") or stripped.startswith("from "):
+        if _IMPORT_RE.match(line):
             lines.append(f"# [ZenSandbox stripped] {line}")
         else:
             lines.append(line)
@@ -141,51 +160,97 @@ def run_zenview(
     yield "🎨 ZenView :: Visualization agent activated."
     yield f"🔎 ZenView :: Analysing DataFrame — {len(df)} rows, {len(df.columns)} columns."
 
-    # Guard: need at least one numeric column to plot
+    # Column roles — computed exactly once and threaded through the guard,
+    # the semantic-cache fingerprint, and the prompt builder
     numeric_cols = df.select_dtypes(include="number").columns.tolist()
+    cat_cols     = df.select_dtypes(include=["object", "category"]).columns.tolist()
+    date_cols    = [c for c in df.columns if "date" in c.lower() or "time" in c.lower()]
+
+    # Guard: need at least one numeric column to plot
     if not numeric_cols:
         yield "⚠️  ZenView :: No numeric columns found — cannot generate chart."
         yield {"success": False, "plot_path": None, "error": "No numeric columns"}
         return
 
-    yield "🧠 ZenView :: Requesting visualization code from LLM (temperature=0)…"
-
-    prompt = _build_prompt(df)
-
-    try:
-        chat = _client.chat.completions.create(
-            model=_MODEL,
-            messages=[
-                {"role": "system", "content": _SYSTEM_PROMPT},
-                {"role": "user",   "content": prompt},
-            ],
-            temperature=0.0,
-            max_tokens=1200,
+    # Semantic cache — fingerprint on schema + log10-bucketed numeric sums so
+    # minor value drift between uploads still reuses the validated chart code.
+    sum_buckets = {
+        col: int(math.log10(abs(float(df[col].sum())) + 1.0))
+        for col in numeric_cols[:4]
+    }
+    viz_fp     = llm_cache.schema_fingerprint(df, extra={"sum_log10": sum_buckets})
+    clean_code = llm_cache.get_code(viz_fp)
+
+    if clean_code is not None:
+        yield (
+            "⚡ ZenView :: Schema fingerprint match. "
+            "Reusing validated chart code (LLM skipped)."
         )
-        llm_response = chat.choices[0].message.content
-    except Exception as exc:
-        yield f"❌ ZenView :: Groq call failed — {exc}"
-        yield {"success": False, "plot_path": None, "error": str(exc)}
-        return
+    else:
+        yield "🧠 ZenView :: Requesting visualization code from LLM (temperature=0)…"
 
-    yield f"📝 ZenView :: LLM returned code:\n```python\n{llm_response[:1000]}\n```"
+        prompt = _build_prompt(df, numeric_cols, cat_cols, date_cols)
 
-    try:
-        raw_code = _extract_code(llm_response)
-    except ValueError as exc:
-        yield str(exc)
-        yield {"success": False, "plot_path": None, "error": str(exc)}
-        return
+        # Exact-key cache — same clean dataset ⇒ same chart code, skip the API call
+        cache_key    = llm_cache.make_key(_SYSTEM_PROMPT, prompt, _MODEL, 0.0)
+        llm_response = llm_cache.get(cache_key)
+
+        if llm_response is not None:
+            yield "⚡ ZenView :: Cache hit. Reusing previous LLM response (no tokens spent)."
+        else:
+            try:
+                # Stream the completion — progress is visible from first token
+                stream = _client.chat.completions.create(
+                    model=_MODEL,
+                    messages=[
+                        {"role": "system", "content": _SYSTEM_PROMPT},
+                        {"role": "user",   "content": prompt},
+                    ],
+                    temperature=0.0,
+                    max_tokens=1200,
+                    stream=True,
+                )
+                buffer: list[str] = []
+                received, next_tick = 0, _STREAM_TICK_CHARS
+                for chunk in stream:
+                    delta = chunk.choices[0].delta.content
+                    if not delta:
+                        continue
+                    buffer.append(delta)
+                    received += len(delta)
+                    if received >= next_tick:
+                        yield f"⏳ ZenView :: Streaming LLM response… {received} chars received."
+                        next_tick = received + _STREAM_TICK_CHARS
+                llm_response = "".join(buffer)
+                llm_cache.put(cache_key, llm_response)
+            except Exception as exc:
+                yield f"❌ ZenView :: Groq call failed — {exc}"
+                yield {"success": False, "plot_path": None, "error": str(exc)}
+                return
+
+        if _DEBUG:
+            yield f"📝 ZenView :: LLM returned code:\n```python\n{llm_response[:1000]}\n```"
+
+        try:
+            raw_code = _extract_code(llm_response)
+        except ValueError as exc:
+            yield str(exc)
+            yield {"success": False, "plot_path": None, "error": str(exc)}
+            return
+
+        clean_code = _sanitize_code(raw_code)
 
-    clean_code = _sanitize_code(raw_code)
     yield "🔧 ZenView :: Executing visualization code (sandbox — no imports allowed)…"
 
     success, exec_output, plot_path = safe_exec_viz(clean_code, df=df, output_path=output_path)
 
-    if exec_output:
+    # Execution log is debug noise on success, but essential on failure
+    if exec_output and (_DEBUG or not success):
         yield f"📋 ZenView :: Execution log:\n```\n{exec_output}\n```"
 
     if success and plot_path:
+        # Chart code ran and produced a figure — remember it for this schema
+        llm_cache.put_code(viz_fp, clean_code)
         yield f"✅ ZenView :: Chart saved → `{plot_path}`"
         yield {"success": True, "plot_path": plot_path, "error": None}
     else:
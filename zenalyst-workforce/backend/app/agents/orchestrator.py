@@ -19,7 +19,7 @@ Coordination flow:
 
 Hand-off protocol
 -----------------
-1. ZenForce receives raw bytes (CSV upload) and writes them to a temp path.
+1. ZenForce receives raw bytes (CSV upload) and parses them in memory.
 2. ZenForce calls `run_zenrecon(df)` — a generator.  It proxies every
    string yield straight to the caller so the UI can display them live.
 3. When ZenRecon yields a DataFrame instead of a string, ZenForce captures
@@ -30,24 +30,26 @@ Hand-off protocol
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import io
 import json
-import tempfile
 import time
-from pathlib import Path
-from typing import AsyncGenerator, Generator
+from typing import AsyncGenerator, BinaryIO, Generator
 
 import pandas as pd
-from groq import Groq
 
 # Sibling agents
 import sys, os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
 from analyst import run_zenrecon  # noqa: E402
+from app.tools import llm_cache   # noqa: E402
 
 # ---------------------------------------------------------------------------
 # Groq client (ZenForce uses the LLM only for its coordination commentary)
+# Shared, pooled client — keep-alive connections reused across all agents.
 # ---------------------------------------------------------------------------
-_client = Groq()
+from app.clients import async_client as _client  # noqa: E402
 _MODEL  = "llama-3.3-70b-versatile"
 
 _ORCHESTRATOR_SYSTEM = """
@@ -66,18 +68,23 @@ Do NOT perform any math or data analysis yourself.
 # ---------------------------------------------------------------------------
 def _run_zenveault_stub(
     clean_df: pd.DataFrame,
-    original_df: pd.DataFrame,
+    original_rows: int,
 ) -> Generator[str, None, None]:
     """
     Minimal inline auditor so the orchestrator works without auditor.py.
     Replace this with `from auditor import run_zenveault` once auditor.py exists.
+
+    Takes the original row *count* rather than the original frame — the audit
+    never touches original row data, so keeping the full frame alive (or
+    copying it) just to compute `duplicates_removed` wastes memory.
     """
     yield "🔐 ZenVault :: Beginning integrity audit…"
 
-    original_rows   = len(original_df)
     cleaned_rows    = len(clean_df)
     duplicates_removed = original_rows - cleaned_rows
-    null_check      = int(clean_df.isnull().sum().sum())
+    # Column-wise null tally — avoids materializing a full boolean frame the
+    # size of clean_df just to sum it twice
+    null_check      = int(sum(clean_df[c].isna().sum() for c in clean_df.columns))
     has_composite   = "CompositeKey" in clean_df.columns
 
     audit = {
@@ -106,19 +113,81 @@ def _run_zenveault_stub(
     yield audit  # type: ignore[misc]   # final structured yield
 
 
+# ---------------------------------------------------------------------------
+# Async plumbing
+# ---------------------------------------------------------------------------
+_SENTINEL = object()
+
+
+async def _iter_in_thread(gen: Generator) -> AsyncGenerator:
+    """Drive a blocking sync generator from the event loop, one item per hop."""
+    while True:
+        item = await asyncio.to_thread(next, gen, _SENTINEL)
+        if item is _SENTINEL:
+            break
+        yield item
+
+
+def _plan_cache_key(filename: str, original_df: pd.DataFrame) -> str:
+    """Plan cache key: filename + sorted columns + 10k-row size bucket."""
+    blob = (
+        f"{filename}|{','.join(sorted(original_df.columns))}|{len(original_df) // 10_000}"
+    )
+    return hashlib.md5(blob.encode()).hexdigest()
+
+
+async def _fetch_plan(filename: str, original_df: pd.DataFrame, plan_key: str) -> str:
+    """Advisory coordination-plan call — runs concurrently with ZenRecon."""
+    plan_resp = await _client.chat.completions.create(
+        model=_MODEL,
+        messages=[
+            {"role": "system", "content": _ORCHESTRATOR_SYSTEM},
+            {
+                "role": "user",
+                "content": (
+                    f"Dataset `{filename}` has columns: {original_df.columns.tolist()} "
+                    f"and {len(original_df)} rows. "
+                    "Give me a 3-bullet coordination plan for ZenRecon → ZenVault."
+                ),
+            },
+        ],
+        temperature=0.2,
+        max_tokens=300,
+    )
+    plan_text = plan_resp.choices[0].message.content.strip()
+    llm_cache.put_plan(plan_key, plan_text)
+    return plan_text
+
+
+def _plan_event(plan_task: asyncio.Task) -> str:
+    """Render a completed plan task as a thought signature (never raises)."""
+    exc = plan_task.exception()
+    if exc is not None:
+        return f"⚠️  ZenForce :: LLM plan skipped ({exc}). Proceeding with default workflow."
+    return f"📋 ZenForce :: Coordination Plan:\n{plan_task.result()}"
+
+
 # ---------------------------------------------------------------------------
 # Core orchestration generator
 # ---------------------------------------------------------------------------
-def run_zenforce(
-    csv_bytes: bytes,
+async def run_zenforce(
+    csv_source: bytes | BinaryIO,
     filename: str = "upload.csv",
-) -> Generator[str | dict, None, None]:
+) -> AsyncGenerator[str | dict, None]:
     """
     Main entry point called by FastAPI.
     Yields str (thought signatures) and, as the very last item, a dict summary.
 
+    `csv_source` is either raw bytes or a seekable binary file object — the
+    upload path hands over its spooled temp file directly so multi-hundred-MB
+    CSVs are never buffered into a bytes copy first.
+
+    The coordination-plan LLM call is advisory, so it is launched as a task
+    right after the CSV parse and awaited opportunistically while ZenRecon's
+    Gate 0 EDA runs — the plan's network round-trip costs zero wall time.
+
     Usage in FastAPI (SSE):
-        async for event in _asyncify(run_zenforce(csv_bytes)):
+        async for event in run_zenforce(csv_source):
             yield f"data: {event}\\n\\n"
     """
 
@@ -126,14 +195,26 @@ def run_zenforce(
     yield f"🚀 ZenForce [{session_id}] :: Workforce activated. Processing `{filename}`…"
 
     # ── 1. Parse CSV ─────────────────────────────────────────────────────────
-    yield "📂 ZenForce :: Reading CSV into memory…"
+    yield "📂 ZenForce :: Reading CSV…"
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".csv") as tmp:
-            tmp.write(csv_bytes)
-            tmp_path = tmp.name
-
-        original_df = pd.read_csv(tmp_path, low_memory=False)
-        Path(tmp_path).unlink(missing_ok=True)
+        # Parse straight from the source — no temp-file round-trip.
+        # The arrow C++ reader is 3-10× faster than the default parser; fall
+        # back to the Python engine for CSVs it cannot handle (ragged rows …).
+        # Parsing runs in a worker thread: a 100 MB CSV would otherwise stall
+        # the event loop (and every other SSE stream) for hundreds of ms.
+        def _parse() -> pd.DataFrame:
+            def _reader() -> BinaryIO:
+                if isinstance(csv_source, (bytes, bytearray)):
+                    return io.BytesIO(csv_source)
+                csv_source.seek(0)
+                return csv_source
+
+            try:
+                return pd.read_csv(_reader(), engine="pyarrow")
+            except Exception:
+                return pd.read_csv(_reader(), low_memory=False)
+
+        original_df = await asyncio.to_thread(_parse)
     except Exception as exc:
         yield f"❌ ZenForce :: CSV parsing failed — {exc}"
         return
@@ -143,41 +224,43 @@ def run_zenforce(
         f"Shape={original_df.shape}, Columns={original_df.columns.tolist()}"
     )
 
-    # ── 2. Ask LLM for a coordination plan (optional commentary) ─────────────
-    yield "🧠 ZenForce :: Drafting coordination plan with LLM…"
-    try:
-        plan_resp = _client.chat.completions.create(
-            model=_MODEL,
-            messages=[
-                {"role": "system", "content": _ORCHESTRATOR_SYSTEM},
-                {
-                    "role": "user",
-                    "content": (
-                        f"Dataset `{filename}` has columns: {original_df.columns.tolist()} "
-                        f"and {len(original_df)} rows. "
-                        "Give me a 3-bullet coordination plan for ZenRecon → ZenVault."
-                    ),
-                },
-            ],
-            temperature=0.2,
-            max_tokens=300,
-        )
-        plan_text = plan_resp.choices[0].message.content.strip()
-        yield f"📋 ZenForce :: Coordination Plan:\n{plan_text}"
-    except Exception as exc:
-        yield f"⚠️  ZenForce :: LLM plan skipped ({exc}). Proceeding with default workflow."
+    # ── 2. Launch the coordination-plan LLM call (overlaps with ZenRecon) ────
+    # Recurring uploads (same file, same schema, similar size) short-circuit
+    # the plan call entirely via the plan cache.
+    plan_key     = _plan_cache_key(filename, original_df)
+    cached_plan  = llm_cache.get_plan(plan_key)
+    plan_task: asyncio.Task | None = None
+    plan_yielded = False
+
+    if cached_plan is not None:
+        yield f"📋 ZenForce :: Coordination Plan (cached):\n{cached_plan}"
+        plan_yielded = True
+    else:
+        yield "🧠 ZenForce :: Drafting coordination plan with LLM (in background)…"
+        plan_task = asyncio.create_task(_fetch_plan(filename, original_df, plan_key))
 
     # ── 3. Hand-off → ZenRecon ───────────────────────────────────────────────
     yield "➡️  ZenForce :: Handing off to ZenRecon…"
 
     clean_df: pd.DataFrame | None = None
 
-    for event in run_zenrecon(original_df.copy()):
+    # No .copy() — safe_exec already shields the original via its own copy,
+    # and doubling peak memory for wide frames buys nothing here.
+    async for event in _iter_in_thread(run_zenrecon(original_df)):
         if isinstance(event, pd.DataFrame):
             clean_df = event          # capture the worker's output
         else:
             yield event               # proxy every thought to the UI
 
+        # Surface the plan the moment its round-trip completes
+        if not plan_yielded and plan_task is not None and plan_task.done():
+            yield _plan_event(plan_task)
+            plan_yielded = True
+
+    if not plan_yielded and plan_task is not None:
+        await asyncio.wait({plan_task})
+        yield _plan_event(plan_task)
+
     if clean_df is None:
         yield "❌ ZenForce :: ZenRecon did not return a clean DataFrame. Aborting."
         return
@@ -191,8 +274,8 @@ def run_zenforce(
 
     # Swap stub for real auditor once auditor.py is ready:
     # from auditor import run_zenveault
-    # for event in run_zenveault(clean_df, original_df):
-    for event in _run_zenveault_stub(clean_df, original_df):
+    # async for event in _iter_in_thread(run_zenveault(clean_df, len(original_df))):
+    async for event in _iter_in_thread(_run_zenveault_stub(clean_df, len(original_df))):
         if isinstance(event, dict):
             audit_result = event
         else:
@@ -206,8 +289,14 @@ def run_zenforce(
         "clean_rows"        : len(clean_df),
         "duplicates_removed": len(original_df) - len(clean_df),
         "audit"             : audit_result,
-        "clean_df_json"     : clean_df.to_json(orient="records", date_format="iso"),
     }
 
+    # Same-process handoff — main.py, the only consumer, pops this object
+    # reference directly: the session frame is installed with zero
+    # serialize/deserialize work and exact dtype fidelity. (The earlier
+    # JSON/Parquet side-channels were always stripped unread, so producing
+    # them was a guaranteed-wasted full-frame serialize per reconcile.)
+    summary["clean_df_obj"] = clean_df
+
     yield f"🏆 ZenForce [{session_id}] :: Reconciliation complete."
     yield summary   # ← FastAPI serialises this as the terminal SSE event
\ No newline at end of file
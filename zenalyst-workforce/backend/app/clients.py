@@ -0,0 +1,22 @@
+"""
+Shared LLM clients — app/clients.py
+
+Every agent module used to build its own Groq() at import time, each with
+a private httpx connection pool — so agents in the same process never
+shared keep-alive connections and each paid its own TCP/TLS handshake
+(~50-150 ms) on first call. Both clients below share generous keep-alive
+limits; import these instead of constructing new ones.
+"""
+
+from __future__ import annotations
+
+import httpx
+from groq import AsyncGroq, Groq
+
+_LIMITS = httpx.Limits(max_keepalive_connections=20, keepalive_expiry=300.0)
+
+# Sync client — ZenRecon / ZenView / ZenChat worker paths
+client = Groq(http_client=httpx.Client(limits=_LIMITS))
+
+# Async client — orchestrator / event-loop paths
+async_client = AsyncGroq(http_client=httpx.AsyncClient(limits=_LIMITS))
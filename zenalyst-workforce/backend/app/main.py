@@ -16,23 +16,35 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import asyncio
+import hashlib
 import json
 import os
 import re
+import tempfile
 import textwrap
 from concurrent.futures import ThreadPoolExecutor
 from typing import AsyncGenerator
 
 from fastapi import FastAPI, File, HTTPException, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 
 import pandas as pd
-from groq import Groq
 
-from app.agents.orchestrator import run_zenforce
+# uvloop cuts per-I/O syscall overhead — worthwhile for the SSE streams and
+# upstream Groq traffic. Optional: default asyncio on platforms without it.
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
+from app.agents.orchestrator import _iter_in_thread, run_zenforce
 from app.agents.Visualizer   import run_zenview
+from app.clients             import async_client as _groq   # shared pooled client
+from app.tools               import fast_ops, llm_cache
 from app.tools.executor      import safe_exec          # ← reused for /ask
 
 app = FastAPI(title="Zenalyst Deterministic Workforce", version="3.0.0")
@@ -42,14 +54,29 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-
-_executor = ThreadPoolExecutor(max_workers=4)
-_groq     = Groq()
-_MODEL    = "llama-3.3-70b-versatile"
+# Compresses the text-heavy JSON responses (/ask answers, /health). The SSE
+# endpoints opt out via Content-Encoding: identity — gzip coalesces flushes,
+# which would trade event latency for bytes on the live streams.
+app.add_middleware(GZipMiddleware, minimum_size=256)
+
+_MODEL = "llama-3.3-70b-versatile"
+
+
+@app.on_event("startup")
+async def _size_default_executor() -> None:
+    # All blocking work goes through asyncio.to_thread, which uses the loop's
+    # default executor — size it to the machine instead of an arbitrary cap
+    # so concurrent /ask, /reconcile and /visualize don't serialize behind
+    # each other.
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=(os.cpu_count() or 4) * 2)
+    )
 
 # ── In-memory session store ───────────────────────────────────────────────────
 _SESSION: dict = {
     "clean_df":      None,
+    "cat_top3":      {},
+    "precomputed":   {},
     "audit_trail":   [],
     "audit_summary": {},
     "original_rows": 0,
@@ -57,46 +84,160 @@ _SESSION: dict = {
 }
 
 
+def _cat_top3(df: pd.DataFrame) -> dict[str, dict]:
+    """
+    Top-3 value counts for the categorical columns the lean context shows.
+    value_counts is a full groupby per column — computing these once at
+    session install removes five O(n log k) sorts from every /ask.
+    """
+    cat_cols = df.select_dtypes(include=["object", "category"]).columns[:5]
+    return {c: df[c].value_counts().head(3).to_dict() for c in cat_cols}
+
+
+def _share_frame(df: pd.DataFrame, filename: str) -> pd.DataFrame:
+    """
+    Re-back the session frame with a memory-mapped Arrow IPC file.
+
+    The frame is written once to a file keyed by the upload filename, then
+    read back through pa.memory_map — numeric column buffers become views
+    over the mapped pages instead of private heap allocations. When the
+    server runs with several workers (gunicorn -w N), every worker mapping
+    the same file shares those physical pages, so extra workers cost ~0
+    instead of O(DF bytes). safe_exec already hands agent code a CoW
+    shallow copy, so the read-only backing is never mutated in place.
+
+    Best-effort: any Arrow failure just keeps the in-heap frame.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+
+        path = os.path.join(
+            tempfile.gettempdir(),
+            f"zen_session_{hashlib.md5(filename.encode()).hexdigest()}.arrow",
+        )
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        # Write to a unique temp file and rename over the keyed path —
+        # truncating the path in place would clobber pages an earlier frame
+        # (re-reconcile of the same file, in-flight /ask) may still be
+        # mapping. os.replace keeps the old inode alive for those mappings;
+        # it's reclaimed when the last one goes away.
+        fd, tmp_path = tempfile.mkstemp(
+            dir=tempfile.gettempdir(), suffix=".arrow"
+        )
+        try:
+            with pa.OSFile(tmp_path, "wb") as sink:
+                with ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+        finally:
+            os.close(fd)
+
+        mapped = ipc.open_file(pa.memory_map(path, "r")).read_all()
+        return mapped.to_pandas(split_blocks=True, self_destruct=True)
+    except Exception:
+        return df
+
+
+def _downcast(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shrink the session frame once at ingestion: int64/float64 → smallest safe
+    width, low-cardinality object columns → category. Every /ask after this
+    scans the frame (describe, value_counts, Phase-1 snippets), and those ops
+    are memory-bound — halving the bytes roughly halves the scan time.
+    """
+    for col in df.select_dtypes("integer").columns:
+        df[col] = pd.to_numeric(df[col], downcast="integer")
+    for col in df.select_dtypes("float").columns:
+        df[col] = pd.to_numeric(df[col], downcast="float")
+    n = len(df)
+    if n:
+        for col in df.select_dtypes("object").columns:
+            if df[col].nunique() / n < 0.5:
+                df[col] = df[col].astype("category")
+    return df
+
+
 # ─────────────────────────────────────────────────────────────────────────────
-# /reconcile  — unchanged from v2
+# SSE framing — tagged fast frames
 # ─────────────────────────────────────────────────────────────────────────────
-async def _stream_reconcile(csv_bytes: bytes, filename: str):
-    def _run():
-        return list(run_zenforce(csv_bytes, filename))
+# Thoughts dominate the reconcile/visualize streams, and each one used to be
+# JSON-encoded here and JSON-parsed in the client just to carry one string.
+# Tagged frames skip that: `T:<text>` is a raw thought, `J:<json>` is a full
+# structured event. Untagged frames remain valid — the demo client falls back
+# to a plain JSON parse for them.
+def _sse_thought(text: str) -> str:
+    if "\n" in text or "\r" in text:
+        # Raw newlines would split the SSE frame — rare multi-line thoughts
+        # take the JSON path where they're escaped.
+        return _sse_json({"type": "thought", "data": text})
+    return f"data: T:{text}\n\n"
+
 
-    events = await asyncio.get_event_loop().run_in_executor(_executor, _run)
+def _sse_json(obj: dict) -> str:
+    return "data: J:" + json.dumps(obj) + "\n\n"
 
+
+# ─────────────────────────────────────────────────────────────────────────────
+# /reconcile  — unchanged from v2
+# ─────────────────────────────────────────────────────────────────────────────
+async def _stream_reconcile(csv_source, filename: str):
     thoughts: list[str] = []
-    for event in events:
+    async for event in run_zenforce(csv_source, filename):
         if isinstance(event, dict):
             _SESSION["audit_summary"]  = event.get("audit", {})
             _SESSION["original_rows"]  = event.get("original_rows", 0)
             _SESSION["filename"]       = filename
             _SESSION["audit_trail"]    = thoughts[:]
 
-            if "clean_df_json" in event:
-                _SESSION["clean_df"] = pd.read_json(
-                    event["clean_df_json"], orient="records"
+            # Direct object handoff from the in-process orchestrator — no
+            # serialize/deserialize round-trip, dtypes preserved as-is. The
+            # reference is popped so the frame never enters the SSE stream.
+            df_obj = event.pop("clean_df_obj", None)
+            if df_obj is not None:
+                _SESSION["clean_df"] = df_obj
+
+            if _SESSION["clean_df"] is not None:
+                _SESSION["clean_df"] = await asyncio.to_thread(
+                    _downcast, _SESSION["clean_df"]
+                )
+                _SESSION["clean_df"] = await asyncio.to_thread(
+                    _share_frame, _SESSION["clean_df"], filename
                 )
-                event.pop("clean_df_json")
+                _SESSION["cat_top3"] = await asyncio.to_thread(
+                    _cat_top3, _SESSION["clean_df"]
+                )
+                _SESSION["precomputed"] = await asyncio.to_thread(
+                    fast_ops.precompute, _SESSION["clean_df"]
+                )
+
+            _CTX_CACHE.clear()   # new session frame ⇒ stale context
 
-            payload = json.dumps({"type": "summary", "data": event})
+            yield _sse_json({"type": "summary", "data": event})
         else:
             thoughts.append(str(event))
-            payload = json.dumps({"type": "thought", "data": str(event)})
-
-        yield f"data: {payload}\n\n"
+            yield _sse_thought(str(event))
 
     yield "data: [DONE]\n\n"
 
 
 @app.post("/reconcile")
 async def reconcile(file: UploadFile = File(...)):
-    csv_bytes = await file.read()
+    # Hand the spooled upload file straight to the orchestrator — Starlette
+    # already spills large uploads to disk, so a full `await file.read()`
+    # would only add an RSS spike the size of the CSV.
     return StreamingResponse(
-        _stream_reconcile(csv_bytes, file.filename or "upload.csv"),
+        _stream_reconcile(file.file, file.filename or "upload.csv"),
         media_type="text/event-stream",
-        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        headers={
+            "Cache-Control"   : "no-cache",
+            "X-Accel-Buffering": "no",
+            # keep SSE out of GZipMiddleware — events must flush per chunk
+            "Content-Encoding": "identity",
+        },
     )
 
 
@@ -112,17 +253,14 @@ async def _stream_visualize():
         }) + "\n\n"
         return
 
-    def _run():
-        return list(run_zenview(df))
-
-    events = await asyncio.get_event_loop().run_in_executor(_executor, _run)
-
-    for event in events:
+    # Stream events as ZenView produces them — buffering the generator with
+    # list() would delay the first thought until the whole pipeline (LLM call
+    # included) finished, and hold every payload in memory at once.
+    async for event in _iter_in_thread(run_zenview(df)):
         if isinstance(event, dict):
-            payload = json.dumps({"type": "viz_result", "data": event})
+            yield _sse_json({"type": "viz_result", "data": event})
         else:
-            payload = json.dumps({"type": "thought", "data": str(event)})
-        yield f"data: {payload}\n\n"
+            yield _sse_thought(str(event))
 
     yield "data: [DONE]\n\n"
 
@@ -132,7 +270,12 @@ async def visualize():
     return StreamingResponse(
         _stream_visualize(),
         media_type="text/event-stream",
-        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        headers={
+            "Cache-Control"   : "no-cache",
+            "X-Accel-Buffering": "no",
+            # keep SSE out of GZipMiddleware — events must flush per chunk
+            "Content-Encoding": "identity",
+        },
     )
 
 
@@ -154,12 +297,42 @@ class AskRequest(BaseModel):
 
 
 # ── Lean context builder (safe for large DataFrames) ─────────────────────────
+# The context string is deterministic for a given session frame, so it is
+# memoized by frame identity + row count. Cleared whenever /reconcile installs
+# a new session DataFrame.
+_CTX_CACHE: dict[tuple[int, int], str] = {}
+
+
+def _fast_md(df: pd.DataFrame, index: bool = False) -> str:
+    """
+    Vectorized pipe-table writer.
+
+    df.to_markdown() routes through tabulate's pure-Python row formatter —
+    an O(rows×cols) Python loop. This does one astype(str) pass and joins,
+    which is ~10× faster for the previews embedded in the lean context.
+    """
+    if index:
+        df = df.reset_index()
+    cols   = [str(c) for c in df.columns]
+    header = "| " + " | ".join(cols) + " |"
+    sep    = "|" + "|".join(["---"] * len(cols)) + "|"
+    body   = "\n".join(
+        "| " + " | ".join(row) + " |" for row in df.astype(str).to_numpy()
+    )
+    return f"{header}\n{sep}\n{body}" if body else f"{header}\n{sep}"
+
+
 def _build_lean_context(df: pd.DataFrame) -> str:
     """
     Build a compact, token-safe context string.
     NEVER sends raw row data for large DataFrames — only schema + stats.
     For small DataFrames (≤200 rows) includes a full markdown preview.
     """
+    cache_key = (id(df), len(df))
+    cached = _CTX_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
     parts: list[str] = []
 
     # 1. Schema — always included, tiny
@@ -172,53 +345,101 @@ def _build_lean_context(df: pd.DataFrame) -> str:
         f"Columns:\n" + "\n".join(schema_lines)
     )
 
-    # 2. Numeric stats — always included
+    # 2 + 3. Numeric describe and any uncached value_counts are column-
+    # independent and release the GIL in their numpy reductions — run them
+    # concurrently instead of serially.
     numeric_df = df.select_dtypes(include="number")
-    if not numeric_df.empty:
-        parts.append(f"## Numeric Statistics\n{numeric_df.describe().to_markdown()}")
+    cat_cols   = df.select_dtypes(include=["object", "category"]).columns.tolist()[:5]
+    top3       = dict(_SESSION.get("cat_top3") or {})
+    missing    = [c for c in cat_cols if c not in top3]
+
+    if not numeric_df.empty or missing:
+        with ThreadPoolExecutor(max_workers=len(missing) + 1) as pool:
+            desc_fut = pool.submit(numeric_df.describe) if not numeric_df.empty else None
+            count_futs = {
+                col: pool.submit(
+                    lambda c=col: df[c].value_counts().head(3).to_dict()
+                )
+                for col in missing
+            }
+            if desc_fut is not None:
+                parts.append(
+                    f"## Numeric Statistics\n{_fast_md(desc_fut.result(), index=True)}"
+                )
+            for col, fut in count_futs.items():
+                top3[col] = fut.result()
 
-    # 3. Categorical stats — top values for object columns
-    cat_cols = df.select_dtypes(include=["object", "category"]).columns.tolist()
     if cat_cols:
-        cat_summary = []
-        for col in cat_cols[:5]:   # cap at 5 columns to save tokens
-            top = df[col].value_counts().head(3).to_dict()
-            cat_summary.append(f"  - {col}: {top}")
+        cat_summary = [f"  - {col}: {top3[col]}" for col in cat_cols]
         parts.append("## Top Categorical Values (sample)\n" + "\n".join(cat_summary))
 
     # 4. Row preview — only for small DataFrames
     if len(df) <= 200:
-        parts.append(f"## Full Dataset\n{df.to_markdown(index=False)}")
+        parts.append(f"## Full Dataset\n{_fast_md(df)}")
     else:
-        parts.append(f"## Row Preview (first 5 rows)\n{df.head(5).to_markdown(index=False)}")
+        parts.append(f"## Row Preview (first 5 rows)\n{_fast_md(df.head(5))}")
 
     # 5. Audit summary — key metrics only
     summary = _SESSION.get("audit_summary", {})
     if summary:
         parts.append(f"## Audit Summary\n```json\n{json.dumps(summary, indent=2)}\n```")
 
-    return "\n\n---\n\n".join(parts)
-
-
-# ── Phase 1: LLM writes pandas code to answer the question ───────────────────
-_CODE_GEN_SYSTEM = """\
-You are ZenCode, a precise Python/pandas code generator.
-Given a DataFrame `df` and a question, write ONLY executable Python code.
-
-RULES:
-- The DataFrame is already loaded as `df`. Do NOT load or read any files.
-- Store your final answer in a variable named `_result`.
+    context = "\n\n---\n\n".join(parts)
+    _CTX_CACHE[cache_key] = context
+    return context
+
+
+# ── Single-conversation ask flow (ZenCode + ZenChat merged) ──────────────────
+# One chat session with a run_pandas tool replaces the old two sequential
+# round-trips (code-gen call, then narrate call). Conversational questions
+# finish in ONE round-trip; computational ones execute the tool call and
+# continue the SAME conversation, so the schema/context tokens are sent once
+# and the provider reuses its KV cache for the shared prefix.
+_ASK_SYSTEM = """\
+You are ZenChat, a professional financial data analyst with a pandas
+execution tool.
+
+The reconciled session dataset is loaded server-side as a DataFrame `df`.
+When the question needs an exact figure (counts, sums, averages, filters,
+aggregations), call the run_pandas tool with Python/pandas code:
+- Store the final value in a variable named `_result`.
 - `_result` must be a simple type: str, int, float, list, or dict.
-- For counts/aggregations: compute them directly (e.g. df.duplicated().sum()).
-- For filtering: return a summary dict, not the full DataFrame.
 - Do NOT use print(). Do NOT import anything. Do NOT use matplotlib.
-- Do NOT explain the code. Output ONLY the raw Python code block, no markdown.
-- If the question cannot be answered with pandas, set _result = "NOT_COMPUTABLE".
+- The code must finish within 5 seconds — prefer vectorized pandas/numpy
+  over Python loops or .apply().
+Call the tool at most once, then answer.
 
-Example output for "how many duplicate rows?":
-_result = int(df.duplicated().sum())
+When answering:
+- Be concise and direct. Lead with the number/fact.
+- Format numbers with commas for readability.
+- Use ONLY the computed result and the provided dataset context.
+- If the computed result is an error, acknowledge it and answer from context.
+- Never fabricate numbers.
 """
 
+_RUN_PANDAS_TOOL = [
+    {
+        "type": "function",
+        "function": {
+            "name": "run_pandas",
+            "description": (
+                "Execute Python/pandas code against the session DataFrame `df` "
+                "and return the value stored in `_result`."
+            ),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "code": {
+                        "type": "string",
+                        "description": "Python/pandas code that sets `_result`.",
+                    }
+                },
+                "required": ["code"],
+            },
+        },
+    }
+]
+
 
 def _extract_code(llm_output: str) -> str:
     """Strip markdown fences from LLM code output if present."""
@@ -229,133 +450,259 @@ def _extract_code(llm_output: str) -> str:
     return llm_output.strip()
 
 
-def _phase1_generate_and_execute(question: str, df: pd.DataFrame) -> tuple[bool, str]:
-    """
-    Ask the LLM to write pandas code, execute it via safe_exec(),
-    and return (computed_successfully, result_as_string).
-    """
-    schema_hint = (
-        f"DataFrame `df` has {len(df):,} rows and {len(df.columns)} columns.\n"
-        f"Columns: {', '.join(df.columns.tolist())}\n"
-        f"Dtypes:\n" + "\n".join(f"  {c}: {t}" for c, t in df.dtypes.items())
-    )
-
-    try:
-        code_response = _groq.chat.completions.create(
-            model=_MODEL,
-            messages=[
-                {"role": "system", "content": _CODE_GEN_SYSTEM},
-                {
-                    "role": "user",
-                    "content": (
-                        f"DataFrame info:\n{schema_hint}\n\n"
-                        f"Question: {question}\n\n"
-                        f"Write the pandas code now:"
-                    ),
-                },
-            ],
-            temperature=0.0,      # fully deterministic for code
-            max_tokens=400,
-        )
-        raw_code = code_response.choices[0].message.content.strip()
-        code = _extract_code(raw_code)
-    except Exception as e:
-        return False, f"Code generation failed: {e}"
-
-    # Don't bother executing if LLM says it's not computable
-    if "_result = \"NOT_COMPUTABLE\"" in code or "_result = 'NOT_COMPUTABLE'" in code:
+def _serialize_result(result) -> str:
+    """Render a safe_exec result as a clean string for the model."""
+    if isinstance(result, pd.DataFrame):
+        return _fast_md(result.head(20))
+    if isinstance(result, pd.Series):
+        return result.to_string()
+    if isinstance(result, dict):
+        return json.dumps(result, indent=2, default=str)
+    if isinstance(result, (list, tuple)):
+        return json.dumps(result, default=str)
+    return str(result)
+
+
+async def _run_tool_code(code: str, df: pd.DataFrame) -> tuple[bool, str]:
+    """Execute tool-call code in the sandbox → (computed_ok, result_str)."""
+    if '_result = "NOT_COMPUTABLE"' in code or "_result = 'NOT_COMPUTABLE'" in code:
         return False, "NOT_COMPUTABLE"
 
-    # Execute via the existing safe sandbox
-    success, output, result = safe_exec(code, df=df)
+    success, output, result = await asyncio.to_thread(safe_exec, code, df=df)
 
     if not success:
         return False, f"Execution error:\n{output}"
-
     if result is None:
         return False, "Code ran but _result was not set."
+    return True, _serialize_result(result)
 
-    # Serialize result to a clean string
-    if isinstance(result, pd.DataFrame):
-        result_str = result.head(20).to_markdown(index=False)
-    elif isinstance(result, pd.Series):
-        result_str = result.to_string()
-    elif isinstance(result, dict):
-        result_str = json.dumps(result, indent=2, default=str)
-    elif isinstance(result, (list, tuple)):
-        result_str = json.dumps(result, default=str)
-    else:
-        result_str = str(result)
 
-    return True, result_str
+def _grounded_user_content(question: str, lean_context: str,
+                           computed_result: str | None = None) -> str:
+    """User message carrying context (+ precomputed result, when available)."""
+    parts = []
+    if computed_result is not None:
+        parts.append(
+            f"COMPUTED RESULT (exact pandas output on the real data):\n"
+            f"```\n{computed_result}\n```"
+        )
+    parts.append(f"DATASET CONTEXT:\n{lean_context}")
+    parts.append(f"USER QUESTION: {question}")
+    return "\n\n---\n\n".join(parts)
 
 
-# ── Phase 2: LLM answers using the computed result as grounded context ────────
-_ANSWER_SYSTEM = """\
-You are ZenChat, a professional financial data analyst.
-You have been given:
-  1. COMPUTED RESULT — the exact output of running pandas code on the real dataset.
-  2. DATASET CONTEXT — schema, statistics, and audit summary.
+async def _prepare_answer(
+    question: str, df: pd.DataFrame, lean_context: str
+) -> tuple[bool, str, list[dict], str | None]:
+    """
+    Computation phase of /ask.
 
-Answer the user's question using ONLY the provided computed result and context.
-- Be concise and direct. Lead with the number/fact.
-- Do NOT say "based on the code" or reference implementation details.
-- Format numbers with commas for readability.
-- If the computed result is an error, acknowledge it and answer from context instead.
-- Never fabricate numbers.
-"""
+    Returns (computed_ok, computed_result, messages, direct_answer):
+      - `messages` is the conversation ready for the final answer completion;
+      - `direct_answer` is non-None when the model already answered in the
+        first round-trip (no tool call needed) — callers should use it as-is.
 
+    Fast paths (intent router hit, cached tool code) skip the first LLM call
+    entirely and inject the computed result into the grounding message.
+    """
+    # Fast-path router — recognized FAQ patterns (duplicate counts, row
+    # counts, column sums/means) are answered by pre-built vectorized kernels
+    # with no LLM call and no sandbox exec.
+    routed = await asyncio.to_thread(
+        fast_ops.match_intent, question, df, _SESSION.get("precomputed")
+    )
+    if routed is not None:
+        messages = [
+            {"role": "system", "content": _ASK_SYSTEM},
+            {"role": "user", "content": _grounded_user_content(question, lean_context, routed)},
+        ]
+        return True, routed, messages, None
+
+    # Tool-code cache — same (normalized) question against the same schema at
+    # temperature 0 always yields the same code, so skip the Groq round-trip
+    question_norm = " ".join(question.lower().split())
+    code_key = llm_cache.make_key(
+        _ASK_SYSTEM,
+        f"{question_norm}::{llm_cache.schema_fingerprint(df)}",
+        _MODEL,
+        0.0,
+    )
+    cached_code = llm_cache.get(code_key)
+    if cached_code is not None:
+        computed_ok, computed_result = await _run_tool_code(cached_code, df)
+        messages = [
+            {"role": "system", "content": _ASK_SYSTEM},
+            {
+                "role": "user",
+                "content": _grounded_user_content(
+                    question,
+                    lean_context,
+                    computed_result if computed_ok
+                    else f"(computation not applicable: {computed_result})",
+                ),
+            },
+        ]
+        return computed_ok, computed_result, messages, None
+
+    # Cold path — one conversation, tool-calling enabled
+    messages = [
+        {"role": "system", "content": _ASK_SYSTEM},
+        {"role": "user", "content": _grounded_user_content(question, lean_context)},
+    ]
+    first = await _groq.chat.completions.create(
+        model=_MODEL,
+        messages=messages,
+        tools=_RUN_PANDAS_TOOL,
+        tool_choice="auto",
+        temperature=0.0,      # fully deterministic for code
+        max_tokens=600,
+    )
+    msg = first.choices[0].message
 
-def _phase2_answer(
-    question: str,
-    computed_result: str,
-    lean_context: str,
-    computation_succeeded: bool,
-) -> str:
-    """Use the computed result + lean context to generate the final answer."""
+    if not msg.tool_calls:
+        # Conversational question — answered in a single round-trip
+        return False, "no computation needed", messages, (msg.content or "").strip()
+
+    call = msg.tool_calls[0]
+    try:
+        code = _extract_code(json.loads(call.function.arguments).get("code", ""))
+    except (json.JSONDecodeError, AttributeError) as exc:
+        return False, f"Tool-call arguments unreadable: {exc}", messages, None
+
+    computed_ok, computed_result = await _run_tool_code(code, df)
+    if computed_ok:
+        # Cache only validated code — a broken generation must stay
+        # regenerable, not replay its failure for the cache TTL.
+        llm_cache.put(code_key, code)
+
+    # Continue the SAME conversation — schema/context is not re-sent
+    messages.append(
+        {
+            "role": "assistant",
+            "content": msg.content or "",
+            "tool_calls": [
+                {
+                    "id": call.id,
+                    "type": "function",
+                    "function": {
+                        "name": "run_pandas",
+                        "arguments": call.function.arguments,
+                    },
+                }
+            ],
+        }
+    )
+    messages.append(
+        {"role": "tool", "tool_call_id": call.id, "content": computed_result}
+    )
+    return computed_ok, computed_result, messages, None
 
-    if computation_succeeded:
-        user_content = (
-            f"COMPUTED RESULT (exact pandas output on the real data):\n"
-            f"```\n{computed_result}\n```\n\n"
-            f"---\n\n"
-            f"DATASET CONTEXT:\n{lean_context}\n\n"
-            f"---\n\n"
-            f"USER QUESTION: {question}"
-        )
-    else:
-        # Fall back to context-only if computation failed/not applicable
-        user_content = (
-            f"Note: Direct computation was not applicable for this question "
-            f"({computed_result}).\n\n"
-            f"DATASET CONTEXT:\n{lean_context}\n\n"
-            f"---\n\n"
-            f"USER QUESTION: {question}"
-        )
 
-    response = _groq.chat.completions.create(
+def _answer_cache_key(messages: list[dict]) -> str:
+    """Exact answer-cache key over the full grounded conversation."""
+    return llm_cache.make_key(
+        _ASK_SYSTEM, json.dumps(messages, sort_keys=True, default=str), _MODEL, 0.1
+    )
+
+
+async def _final_answer(messages: list[dict]) -> str:
+    """Finish the conversation with the narrated answer (cache-aware)."""
+    answer_key = _answer_cache_key(messages)
+    answer = llm_cache.get(answer_key)
+    if answer is not None:
+        return answer
+
+    response = await _groq.chat.completions.create(
         model=_MODEL,
-        messages=[
-            {"role": "system",  "content": _ANSWER_SYSTEM},
-            {"role": "user",    "content": user_content},
-        ],
+        messages=messages,
         temperature=0.1,
         max_tokens=600,
     )
-    return response.choices[0].message.content.strip()
+    answer = response.choices[0].message.content.strip()
+    llm_cache.put(answer_key, answer)
+    return answer
+
+
+# ── /ask streaming path — tokens reach the client as they are generated ─────
+async def _stream_ask(question: str, df: pd.DataFrame) -> AsyncGenerator[str, None]:
+    try:
+        lean_context = await asyncio.to_thread(_build_lean_context, df)
+        computed_ok, computed_result, messages, direct_answer = await _prepare_answer(
+            question, df, lean_context
+        )
+    except Exception as exc:
+        yield "data: " + json.dumps(
+            {"type": "error", "data": f"ZenChat error: {type(exc).__name__}: {exc}"}
+        ) + "\n\n"
+        return
+
+    yield "data: " + json.dumps(
+        {"type": "computed", "data": computed_result if computed_ok else None}
+    ) + "\n\n"
+
+    answer = direct_answer
+    if answer is None:
+        answer = llm_cache.get(_answer_cache_key(messages))
+
+    if answer is not None:
+        # Direct answer or cache hit — arrives as a single token event
+        yield "data: " + json.dumps({"type": "token", "data": answer}) + "\n\n"
+    else:
+        answer_key = _answer_cache_key(messages)
+        try:
+            response = await _groq.chat.completions.create(
+                model=_MODEL,
+                messages=messages,
+                temperature=0.1,
+                max_tokens=600,
+                stream=True,
+            )
+            parts: list[str] = []
+            async for chunk in response:
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield "data: " + json.dumps({"type": "token", "data": delta}) + "\n\n"
+            answer = "".join(parts).strip()
+            llm_cache.put(answer_key, answer)
+        except Exception as exc:
+            yield "data: " + json.dumps(
+                {"type": "error", "data": f"ZenChat error: {type(exc).__name__}: {exc}"}
+            ) + "\n\n"
+            return
+
+    yield "data: " + json.dumps({
+        "type": "answer_meta",
+        "data": {
+            "grounded": True,
+            "computed": computed_ok,
+            "session": {
+                "filename":      _SESSION.get("filename"),
+                "original_rows": _SESSION.get("original_rows"),
+                "clean_rows":    len(df),
+            },
+        },
+    }) + "\n\n"
+    yield "data: [DONE]\n\n"
 
 
 # ── /ask endpoint ─────────────────────────────────────────────────────────────
 @app.post("/ask")
-async def ask(req: AskRequest):
+async def ask(req: AskRequest, stream: bool = False):
     """
-    ZenChat v3 — Two-phase DataFrame-Augmented Generation.
+    ZenChat v3 — DataFrame-Augmented Generation, single conversation.
 
-    Phase 1 (ZenCode):  LLM writes pandas → safe_exec() computes exact answer
-    Phase 2 (ZenChat):  LLM narrates the computed result in natural language
+    The model answers directly (conversational questions — one round-trip)
+    or calls the run_pandas tool; the sandboxed result is fed back into the
+    same conversation and the model narrates it. Either way the schema and
+    context tokens are sent exactly once.
 
     This handles BOTH conversational questions (context-only) AND
     computational questions (duplicates, sums, counts, filters, etc.)
+
+    With ?stream=true the answer is streamed as SSE (computed → token* →
+    answer_meta → [DONE]) so first tokens reach the client in a few hundred
+    ms instead of after the full Phase-2 generation.
     """
     if not req.question.strip():
         raise HTTPException(status_code=400, detail="Question cannot be empty.")
@@ -369,28 +716,30 @@ async def ask(req: AskRequest):
             "computed": False,
         }
 
-    try:
-        # ── Phase 1: Compute ──────────────────────────────────────────────────
-        computed_ok, computed_result = await asyncio.get_event_loop().run_in_executor(
-            _executor,
-            _phase1_generate_and_execute,
-            req.question,
-            df,
+    if stream:
+        return StreamingResponse(
+            _stream_ask(req.question, df),
+            media_type="text/event-stream",
+            headers={
+            "Cache-Control"   : "no-cache",
+            "X-Accel-Buffering": "no",
+            # keep SSE out of GZipMiddleware — events must flush per chunk
+            "Content-Encoding": "identity",
+        },
         )
 
-        # ── Build lean context (always, as Phase 2 fallback) ─────────────────
-        lean_context = _build_lean_context(df)
-
-        # ── Phase 2: Answer ───────────────────────────────────────────────────
-        answer = await asyncio.get_event_loop().run_in_executor(
-            _executor,
-            _phase2_answer,
-            req.question,
-            computed_result,
-            lean_context,
-            computed_ok,
+    try:
+        # ── Computation phase (single tool-calling conversation) ─────────────
+        lean_context = await asyncio.to_thread(_build_lean_context, df)
+        computed_ok, computed_result, messages, direct_answer = await _prepare_answer(
+            req.question, df, lean_context
         )
 
+        # ── Final answer — already produced for conversational questions ─────
+        answer = direct_answer
+        if answer is None:
+            answer = await _final_answer(messages)
+
     except Exception as exc:
         raise HTTPException(
             status_code=500,
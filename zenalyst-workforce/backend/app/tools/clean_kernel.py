@@ -0,0 +1,114 @@
+"""
+ZenKernel — tools/clean_kernel.py
+Deterministic Gate-1 cleaning pipeline (no LLM round-trip).
+
+The Gate-1 cleaning contract is the same every run: drop rows where both
+date AND amount are null, fill vendor nulls with "UNKNOWN", normalize
+date/amount, build `Vendor_Slug`, concatenate `CompositeKey`. Paying a
+full LLM generation (~3-8 s + tokens) to re-derive that code is pure
+overhead whenever the Date/Amount/Vendor columns can be identified by
+name. This module implements the contract as a single vectorized pass —
+pandas/numpy column ops, no per-row Python — and ZenRecon only falls
+back to the LLM path when column detection fails.
+"""
+
+from __future__ import annotations
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# ── Column auto-detection (name-based, case-insensitive) ─────────────────────
+_DATE_RE   = re.compile(r"date|time",                          re.IGNORECASE)
+_AMOUNT_RE = re.compile(r"amount|amt|value|price|total|cost",  re.IGNORECASE)
+_VENDOR_RE = re.compile(r"vendor|merchant|desc|payee|supplier", re.IGNORECASE)
+
+# Slug alphabet: chars kept verbatim — spaces map to "_", all else is dropped
+_SLUG_KEEP = frozenset("abcdefghijklmnopqrstuvwxyz0123456789_")
+
+
+def _slugify(value: str) -> str:
+    """
+    Single-walk slug: lowercase + strip + spaces→underscore + drop the rest.
+
+    Equivalent to the 4-pass `.str.lower().str.strip().str.replace(...)
+    .str.replace(regex)` chain, but touches each character exactly once and
+    compiles no regex.
+    """
+    out = []
+    for ch in value.strip().lower():
+        if ch in _SLUG_KEEP:
+            out.append(ch)
+        elif ch == " ":
+            out.append("_")
+    return "".join(out)
+
+
+def slugify_array(values: np.ndarray) -> np.ndarray:
+    """Apply `_slugify` across an array of strings (object-dtype output)."""
+    return np.array([_slugify(v) for v in values], dtype=object)
+
+
+def detect_columns(columns: list[str]) -> dict[str, str] | None:
+    """
+    Map DataFrame columns to the Date/Amount/Vendor roles by name.
+
+    Returns {"date": col, "amount": col, "vendor": col} or None when any
+    role cannot be resolved — the caller then falls back to the LLM path.
+    """
+    date_col   = next((c for c in columns if _DATE_RE.search(c)),   None)
+    amount_col = next((c for c in columns if _AMOUNT_RE.search(c) and c != date_col), None)
+    vendor_col = next(
+        (c for c in columns if _VENDOR_RE.search(c) and c not in (date_col, amount_col)),
+        None,
+    )
+
+    if date_col is None or amount_col is None or vendor_col is None:
+        return None
+    return {"date": date_col, "amount": amount_col, "vendor": vendor_col}
+
+
+def run_clean_kernel(df: pd.DataFrame, roles: dict[str, str]) -> pd.DataFrame:
+    """
+    Execute the Gate-1 cleaning contract deterministically.
+
+    Produces `Date_norm`, `Amount_norm`, `Vendor_Slug`, and `CompositeKey`
+    exactly as the LLM-generated code would, using vectorized column ops.
+    """
+    date_col, amount_col, vendor_col = roles["date"], roles["amount"], roles["vendor"]
+    df = df.copy()
+
+    # 1. Drop rows where both date AND amount are null
+    df = df[~(df[date_col].isna() & df[amount_col].isna())]
+
+    # 2. Fill vendor nulls
+    df[vendor_col] = df[vendor_col].fillna("UNKNOWN")
+
+    # 3. Date → YYYY-MM-DD string
+    dates = pd.to_datetime(df[date_col], errors="coerce")
+    df["Date_norm"] = dates.dt.strftime("%Y-%m-%d").fillna("NaT")
+
+    # 4. Amount → float → 2-decimal string (vectorized via np.char.mod)
+    amounts = pd.to_numeric(df[amount_col], errors="coerce").fillna(0.0).round(2)
+    df["Amount_norm"] = np.char.mod("%.2f", amounts.to_numpy(dtype="float64"))
+
+    # 5. Vendor slug: lowercase, strip, spaces→underscores, alnum+underscore
+    #    only. Vendor cardinality is usually ≪ row count, so go through a
+    #    categorical: slugify each unique vendor once, then fan out by code.
+    vendors    = df[vendor_col].astype(str).astype("category")
+    cat_slugs  = slugify_array(vendors.cat.categories.to_numpy(dtype=object))
+    df["Vendor_Slug"] = cat_slugs[vendors.cat.codes.to_numpy()]
+
+    # 6. CompositeKey = Date_norm | Amount_norm | Vendor_Slug
+    #    Built with np.char.add over fixed-width unicode arrays — a single
+    #    vectorized pass instead of per-row PyObject string concatenation.
+    date_arr   = df["Date_norm"].to_numpy(dtype="U")
+    amt_arr    = df["Amount_norm"].to_numpy(dtype="U")
+    vendor_arr = df["Vendor_Slug"].to_numpy(dtype="U")
+    df["CompositeKey"] = np.char.add(
+        np.char.add(np.char.add(np.char.add(date_arr, "|"), amt_arr), "|"),
+        vendor_arr,
+    )
+
+    return df
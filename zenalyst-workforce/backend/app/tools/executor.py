@@ -4,40 +4,66 @@ Safe exec() wrapper that captures stdout/stderr for streaming to the UI.
 Agents NEVER perform math. They write code. This module runs it.
 
 v2 additions:
-  - matplotlib (plt) and seaborn (sns) pre-injected into the namespace
+  - matplotlib (plt) and seaborn (sns) injected into the viz namespace,
+    lazily imported on the first safe_exec_viz() call
   - safe_exec_viz() variant — headless Agg backend, injects plt/sns/SAVE_PATH
   - ALLOWED_MODULES extended to include matplotlib & seaborn roots
 """
 
+import ctypes
+import functools
 import io
 import os
 import sys
+import threading
 import traceback
 import pandas as pd
 import numpy as np
-from contextlib import redirect_stdout, redirect_stderr
+from contextlib import contextmanager, redirect_stdout, redirect_stderr
 from typing import Any, Dict, Set, Tuple
 
-# ── Pre-import viz libs with the non-interactive Agg backend ─────────────────
-# Must set backend BEFORE importing pyplot to avoid display errors on servers.
-import matplotlib
-matplotlib.use("Agg")                   # headless — no GUI window needed
-import matplotlib.pyplot as plt         # noqa: E402
-import seaborn as sns                   # noqa: E402
-
-# Apply a professional dark financial theme once at module load
-sns.set_theme(style="darkgrid", palette="muted")
-plt.rcParams.update({
-    "figure.facecolor": "#0e1117",
-    "axes.facecolor":   "#1a1f2e",
-    "axes.edgecolor":   "#3a3f5c",
-    "text.color":       "#e0e0e0",
-    "axes.labelcolor":  "#e0e0e0",
-    "xtick.color":      "#a0a0b0",
-    "ytick.color":      "#a0a0b0",
-    "grid.color":       "#2a2f4a",
-    "font.family":      "DejaVu Sans",
-})
+# Copy-on-Write gives agent code an isolated view of the caller's frame
+# without the eager full-frame memcpy — mutations shallow-copy only the
+# touched columns.
+pd.options.mode.copy_on_write = True
+
+# ── Lazy viz libs — loaded on the first safe_exec_viz call ───────────────────
+# pyplot + seaborn cost ~1 s of import time and ~30 MB RSS; /ask and the
+# reconcile pipeline only ever touch safe_exec, so ask-only workers never
+# pay for them.
+plt = None          # populated by _ensure_viz()
+sns = None
+_viz_ready = False
+
+
+def _ensure_viz() -> None:
+    """Import matplotlib/seaborn and apply the dark theme exactly once."""
+    global plt, sns, _viz_ready
+    if _viz_ready:
+        return
+
+    # Must set backend BEFORE importing pyplot to avoid display errors on servers.
+    import matplotlib
+    matplotlib.use("Agg")               # headless — no GUI window needed
+    import matplotlib.pyplot as _plt
+    import seaborn as _sns
+
+    # Apply a professional dark financial theme once
+    _sns.set_theme(style="darkgrid", palette="muted")
+    _plt.rcParams.update({
+        "figure.facecolor": "#0e1117",
+        "axes.facecolor":   "#1a1f2e",
+        "axes.edgecolor":   "#3a3f5c",
+        "text.color":       "#e0e0e0",
+        "axes.labelcolor":  "#e0e0e0",
+        "xtick.color":      "#a0a0b0",
+        "ytick.color":      "#a0a0b0",
+        "grid.color":       "#2a2f4a",
+        "font.family":      "DejaVu Sans",
+    })
+
+    plt, sns = _plt, _sns
+    _viz_ready = True
 
 # Ensure the reports directory exists at module load
 _REPORTS_DIR = os.path.abspath(
@@ -66,6 +92,55 @@ def _make_safe_import(allowed: Set[str]):
     return _safe_import
 
 
+# ── Execution deadline ───────────────────────────────────────────────────────
+# Agent code with an accidental infinite loop or a quadratic .apply() would
+# otherwise pin a worker thread forever and starve every later /ask. A
+# watchdog timer raises TimeoutError inside the exec'ing thread via
+# PyThreadState_SetAsyncExc. Limitation: the exception lands at the next
+# bytecode boundary, so a single long-running C call (one huge numpy op)
+# finishes before the timeout fires — good enough for loop/apply runaways.
+_EXEC_TIMEOUT_SECONDS = 5.0
+
+
+@contextmanager
+def _deadline(seconds: float = _EXEC_TIMEOUT_SECONDS):
+    tid = threading.get_ident()
+    # The exec'ing thread is a pooled executor thread reused by every
+    # endpoint — if the timer fired after exec returned but before cancel(),
+    # the injected TimeoutError would land in whatever unrelated work that
+    # thread picks up next. The lock + done flag close that window: once the
+    # with-body exits, _fire can no longer inject.
+    done = False
+    lock = threading.Lock()
+
+    def _fire() -> None:
+        with lock:
+            if done:
+                return
+            ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                ctypes.c_ulong(tid), ctypes.py_object(TimeoutError)
+            )
+
+    timer = threading.Timer(seconds, _fire)
+    timer.daemon = True
+    timer.start()
+    try:
+        yield
+    finally:
+        with lock:
+            done = True
+        timer.cancel()
+
+
+# ── Bytecode cache — repeated code strings skip the parser/compiler ──────────
+# The semantic/codegen caches make re-running identical agent code the common
+# case (fixed EDA snippet, cached cleaning code, Gate-2 dedup snippet, cached
+# /ask codegen), so cache the compiled code objects with a real LRU.
+@functools.lru_cache(maxsize=512)
+def _compile_cached(code: str, filename: str) -> Any:
+    return compile(code, filename, "exec")
+
+
 def _base_builtins(allowed: Set[str] | None = None) -> dict:
     return {
         "__import__": _make_safe_import(allowed or _BASE_ALLOWED),
@@ -101,7 +176,7 @@ def safe_exec(
         "np": np,
     }
     if df is not None:
-        namespace["df"] = df.copy()
+        namespace["df"] = df.copy(deep=False)   # CoW — no data duplication
     if extra_globals:
         namespace.update(extra_globals)
 
@@ -111,10 +186,12 @@ def safe_exec(
     result: Any = None
 
     try:
-        with redirect_stdout(stdout_buf), redirect_stderr(stderr_buf):
-            exec(compile(code, "<agent_code>", "exec"), namespace)  # noqa: S102
+        with redirect_stdout(stdout_buf), redirect_stderr(stderr_buf), _deadline():
+            exec(_compile_cached(code, "<agent_code>"), namespace)  # noqa: S102
         success = True
         result = namespace.get("_result", namespace.get("df"))
+    except TimeoutError:
+        return False, f"Timed out after {_EXEC_TIMEOUT_SECONDS:.0f}s", None
     except Exception:
         stderr_buf.write(traceback.format_exc())
 
@@ -146,13 +223,15 @@ def safe_exec_viz(
 
     Returns (success, output_str, plot_path_or_None)
     """
+    _ensure_viz()   # first call pays the matplotlib/seaborn import, later calls don't
+
     save_path = output_path or os.path.join(_REPORTS_DIR, "analysis_plot.png")
 
     namespace: Dict[str, Any] = {
         "__builtins__": _base_builtins(_VIZ_ALLOWED),
         "pd":          pd,
         "np":          np,
-        "df":          df.copy(),
+        "df":          df.copy(deep=False),   # CoW — no data duplication
         "plt":         plt,          # ← pre-injected, no import needed
         "sns":         sns,          # ← pre-injected, no import needed
         "SAVE_PATH":   save_path,    # ← LLM uses this variable directly
@@ -164,10 +243,12 @@ def safe_exec_viz(
     success = False
 
     try:
-        with redirect_stdout(stdout_buf), redirect_stderr(stderr_buf):
-            exec(compile(code, "<viz_agent_code>", "exec"), namespace)  # noqa: S102
+        with redirect_stdout(stdout_buf), redirect_stderr(stderr_buf), _deadline():
+            exec(_compile_cached(code, "<viz_agent_code>"), namespace)  # noqa: S102
         success = True
         stdout_buf.write(f"\n[ZenView] Plot saved → {save_path}")
+    except TimeoutError:
+        return False, f"Timed out after {_EXEC_TIMEOUT_SECONDS:.0f}s", None
     except Exception:
         stderr_buf.write(traceback.format_exc())
     finally:
@@ -0,0 +1,160 @@
+"""
+ZenCode fast paths — tools/fast_ops.py
+
+Pre-built vectorized kernels for the reductions the /ask code generator
+emits over and over (duplicate counts, column sums/means, groupby-sums),
+plus a conservative intent router that serves those questions directly —
+no Groq round-trip, no sandboxed exec.
+
+Everything here runs on the underlying numpy buffers (hash columns,
+factorized codes, np.bincount) so the hot loops stay in C. The router
+only fires when the question matches a known pattern AND the referenced
+column resolves unambiguously; anything else falls through to the normal
+LLM code-gen path.
+"""
+
+from __future__ import annotations
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Kernels — all O(rows) single passes on numpy buffers
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def duplicate_count(df: pd.DataFrame) -> int:
+    """Row-level duplicate count via vectorized 64-bit row hashes."""
+    hashes = pd.util.hash_pandas_object(df, index=False)
+    return int(hashes.duplicated().sum())
+
+
+def column_sum(df: pd.DataFrame, col: str) -> float:
+    # nansum, not ndarray.sum() — must match precompute()'s skipna pandas
+    # reductions, or one null turns a grounded answer into "nan".
+    return float(np.nansum(df[col].to_numpy(dtype="float64")))
+
+
+def column_nulls(df: pd.DataFrame, col: str) -> int:
+    return int(df[col].isna().sum())
+
+
+def column_mean(df: pd.DataFrame, col: str) -> float:
+    return float(np.nanmean(df[col].to_numpy(dtype="float64")))
+
+
+def groupby_sum(df: pd.DataFrame, key: str, val: str) -> dict:
+    """Groupby-sum via factorize + np.bincount — no pandas groupby machinery."""
+    codes, uniques = pd.factorize(df[key], use_na_sentinel=True)
+    vals = np.nan_to_num(df[val].to_numpy(dtype="float64"))
+    mask = codes >= 0
+    sums = np.bincount(codes[mask], weights=vals[mask], minlength=len(uniques))
+    return {str(k): round(float(v), 2) for k, v in zip(uniques, sums)}
+
+
+def precompute(df: pd.DataFrame) -> dict:
+    """
+    Session fingerprints computed once at reconcile time. The router serves
+    the matching FAQ questions straight from this dict — a lookup instead of
+    an O(rows) scan per /ask.
+    """
+    return {
+        "dup_count"    : duplicate_count(df),
+        "row_count"    : len(df),
+        "nulls_per_col": {c: int(n) for c, n in df.isnull().sum().items()},
+        "numeric_sums" : {
+            c: float(s) for c, s in df.select_dtypes("number").sum().items()
+        },
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Intent router
+# ─────────────────────────────────────────────────────────────────────────────
+# Every pattern is anchored to the end of the question: a trailing clause
+# ("for vendor X", "excluding duplicates", "have a missing value") means a
+# filtered aggregate these kernels can't honor, and serving the unfiltered
+# number as a grounded result would be confidently wrong. Qualified
+# questions must fall through to the LLM code-gen path.
+_TAIL    = r"[`'\"]?(?: column| field)?\s*[?.!]*\s*$"
+_DUP_RE  = re.compile(
+    r"(?:how many|number of) duplicate(?:s| (?:rows?|records?|entries))?"
+    r"(?: are there| were (?:there|removed|found))?\s*[?.!]*\s*$",
+    re.I,
+)
+_ROWS_RE = re.compile(
+    r"how many (?:rows|records|entries|transactions)(?: are there)?"
+    r"(?: in (?:the )?(?:dataset|data|file|csv|table))?\s*[?.!]*\s*$",
+    re.I,
+)
+_SUM_RE  = re.compile(r"(?:total|sum)(?: of| for)?(?: the)? [`'\"]?(\w+)" + _TAIL, re.I)
+_BY_RE   = re.compile(r"(?:total|sum)(?: of| for)?(?: the)? [`'\"]?(\w+)[`'\"]? (?:by|per|for each) [`'\"]?(\w+)" + _TAIL, re.I)
+_AVG_RE  = re.compile(r"(?:average|mean)(?: of| for)?(?: the)? [`'\"]?(\w+)" + _TAIL, re.I)
+_NULL_RE = re.compile(r"(?:nulls?|missing values?)(?: (?:are there)?\s*(?:in|for))(?: the)? [`'\"]?(\w+)" + _TAIL, re.I)
+
+
+def _resolve_column(token: str, df: pd.DataFrame, numeric: bool = True) -> str | None:
+    """Map a question token to exactly one column name (case-insensitive)."""
+    pool = df.select_dtypes("number").columns if numeric else df.columns
+    hits = [c for c in pool if token.lower() in str(c).lower()]
+    return hits[0] if len(hits) == 1 else None
+
+
+def match_intent(
+    question: str,
+    df: pd.DataFrame,
+    precomputed: dict | None = None,
+) -> str | None:
+    """
+    Serve a recognized question directly from a fast kernel, or — when the
+    session's `precompute` fingerprints are supplied — from a dict lookup
+    with no scan at all.
+
+    Returns the computed result as a string, or None when the question
+    does not match a routed pattern (caller falls back to LLM code-gen).
+    """
+    pre = precomputed or {}
+    try:
+        if _DUP_RE.search(question):
+            dup = pre.get("dup_count")
+            return str(dup if dup is not None else duplicate_count(df))
+
+        if _ROWS_RE.search(question):
+            return str(pre.get("row_count", len(df)))
+
+        m = _NULL_RE.search(question)
+        if m:
+            col = _resolve_column(m.group(1), df, numeric=False)
+            if col is not None:
+                nulls = pre.get("nulls_per_col", {}).get(col)
+                return str(nulls if nulls is not None else column_nulls(df, col))
+
+        # Checked before the plain sum — "total amount by vendor" matches both.
+        m = _BY_RE.search(question)
+        if m:
+            val = _resolve_column(m.group(1), df)
+            key = _resolve_column(m.group(2), df, numeric=False)
+            if val is not None and key is not None and key != val:
+                per_group = groupby_sum(df, key, val)
+                return "\n".join(f"{k}: {v:,.2f}" for k, v in per_group.items())
+
+        m = _SUM_RE.search(question)
+        if m:
+            col = _resolve_column(m.group(1), df)
+            if col is not None:
+                total = pre.get("numeric_sums", {}).get(col)
+                if total is None:
+                    total = column_sum(df, col)
+                return f"{total:,.2f}"
+
+        m = _AVG_RE.search(question)
+        if m:
+            col = _resolve_column(m.group(1), df)
+            if col is not None:
+                return f"{column_mean(df, col):,.2f}"
+    except Exception:
+        return None   # never let a fast path break the normal flow
+
+    return None
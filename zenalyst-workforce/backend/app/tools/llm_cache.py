@@ -0,0 +1,101 @@
+"""
+ZenCache — tools/llm_cache.py
+Exact-key response cache for deterministic (temperature=0) LLM calls.
+
+Every agent prompt in this system is fully deterministic — same system
+prompt + same user prompt + temperature 0.0 always yields the same code.
+Re-uploading the same CSV therefore pays a full Groq round-trip (seconds)
+for a response we already have on disk. This module turns that into a
+<1 ms diskcache lookup.
+
+Key  = SHA256(system_prompt + user_prompt + model + temperature)
+Store = diskcache.Cache under /tmp/zen_llm_cache (survives restarts)
+TTL  = 24 h — long enough for a working session, short enough that a
+       model upgrade naturally invalidates stale generations.
+
+Semantic (schema-fingerprint) layer
+-----------------------------------
+The generated cleaning/viz code depends almost entirely on the *schema*
+(column names + dtypes), not on row-level values. Two different uploads
+with the same schema produce near-identical code, but their exact-key
+hashes differ because the prompts embed row samples and stats. The
+fingerprint layer keys validated code on
+`md5(sorted_cols + dtypes [+ caller extras])` so schema-matched uploads
+reuse previously generated code without any LLM call at all.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+
+import pandas as pd
+from diskcache import Cache
+
+_CACHE_DIR   = "/tmp/zen_llm_cache"
+_TTL_SECONDS = 86_400          # 24 h
+
+_cache = Cache(_CACHE_DIR)
+
+
+def make_key(
+    system_prompt: str,
+    user_prompt: str,
+    model: str,
+    temperature: float = 0.0,
+) -> str:
+    """Exact cache key — any change to prompt, model, or temperature misses."""
+    blob = f"{system_prompt}{user_prompt}{model}{temperature}".encode()
+    return hashlib.sha256(blob).hexdigest()
+
+
+def get(key: str) -> str | None:
+    """Return the cached LLM response for `key`, or None on miss."""
+    return _cache.get(key)
+
+
+def put(key: str, response: str) -> None:
+    """Store an LLM response under `key` with the standard TTL."""
+    _cache.set(key, response, expire=_TTL_SECONDS)
+
+
+# ── Semantic layer — validated code keyed on schema fingerprint ──────────────
+def schema_fingerprint(df: pd.DataFrame, extra: dict | None = None) -> str:
+    """
+    Structural fingerprint of a DataFrame: sorted column names + dtypes.
+
+    `extra` lets callers widen or narrow the key (e.g. ZenView buckets its
+    numeric summary to log10 bins so minor value drift still hits).
+    """
+    payload: dict = {
+        "cols":   sorted(df.columns.tolist()),
+        "dtypes": {c: str(df[c].dtype) for c in df.columns},
+    }
+    if extra:
+        payload["extra"] = extra
+    blob = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.md5(blob).hexdigest()
+
+
+# Coordination plans are advisory commentary — they can age out slowly
+_PLAN_TTL_SECONDS = 7 * 86_400      # 7 days
+
+
+def get_plan(key: str) -> str | None:
+    """Return a cached coordination plan, or None on miss."""
+    return _cache.get(f"plan::{key}")
+
+
+def put_plan(key: str, plan: str) -> None:
+    """Store a coordination plan with the long plan TTL."""
+    _cache.set(f"plan::{key}", plan, expire=_PLAN_TTL_SECONDS)
+
+
+def get_code(fingerprint: str) -> str | None:
+    """Return previously validated generated code for this schema, or None."""
+    return _cache.get(f"code::{fingerprint}")
+
+
+def put_code(fingerprint: str, code: str) -> None:
+    """Store *validated* generated code (only call after it ran successfully)."""
+    _cache.set(f"code::{fingerprint}", code, expire=_TTL_SECONDS)
@@ -3,9 +3,14 @@ demo.py — Streamlit Frontend  (v2)
 Panels: Reconcile | Visualize | ZenChat
 """
 
-import json
 import io
-import requests
+import queue
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import orjson
 import pandas as pd
 import streamlit as st
 
@@ -17,11 +22,159 @@ st.set_page_config(
     layout="wide",
 )
 
+
+# ── Shared HTTP session ───────────────────────────────────────────────────────
+@st.cache_resource
+def http() -> httpx.Client:
+    """
+    One pooled client per Streamlit process. Every rerun reuses warm
+    keep-alive connections instead of paying a fresh TCP(+TLS) handshake per
+    click, and HTTP/2 multiplexes the parallel flows (reconcile SSE, /plot
+    prefetch, /ask) over a single connection instead of one socket each.
+    """
+    return httpx.Client(
+        timeout=httpx.Timeout(180.0, connect=10.0),
+        transport=httpx.HTTPTransport(
+            retries=2,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=64, max_connections=256),
+        ),
+        # Text-heavy /ask JSON compresses 3-10x; the backend's GZipMiddleware
+        # honors this while SSE streams stay identity-encoded for latency.
+        headers={"Accept-Encoding": "gzip, deflate, zstd"},
+    )
+
+
+# ── SSE parsing ───────────────────────────────────────────────────────────────
+# Hoisted out of the per-event loop — the prefix test and sentinel compare
+# run once per frame, so they shouldn't touch a fresh literal each time.
+_DATA = b"data:"
+_DONE = b"[DONE]"
+_THOUGHT = b"T:"
+_JSON    = b"J:"
+
+
+def _sse_events(resp):
+    """
+    Yield parsed payload dicts from a streaming SSE response.
+
+    Byte-framed: lines stay bytes end-to-end (no per-event UTF-8 decode),
+    the `data:` prefix check and `[DONE]` sentinel compare against bytes,
+    and orjson parses the payload bytes in C. Shared by the Reconcile and
+    Visualize panels so the hot per-event path lives in one place.
+
+    Frames over raw chunks (httpx's iter_lines would decode to str).
+    """
+    pending = b""
+    for chunk in resp.iter_raw():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for raw in lines:
+            # No pre-strip: SSE lines never lead with whitespace, and the
+            # payload slice below strips the trailing \r — so the common
+            # non-data line costs just a prefix check, no allocation.
+            if not raw.startswith(_DATA):
+                continue
+            buf = raw[len(_DATA):].strip()
+            if buf == _DONE:
+                return
+            # Tagged frames (see backend _sse_thought/_sse_json): thoughts
+            # dominate the stream and carry one string — decode it straight,
+            # no JSON parse. Untagged frames stay parseable for back-compat.
+            if buf.startswith(_THOUGHT):
+                yield {"type": "thought", "data": buf[len(_THOUGHT):].decode()}
+                continue
+            if buf.startswith(_JSON):
+                buf = buf[len(_JSON):]
+            try:
+                yield orjson.loads(buf)
+            except orjson.JSONDecodeError:
+                continue
+
+@st.cache_resource
+def _prefetch_pool() -> ThreadPoolExecutor:
+    """Small shared pool for overlapping downloads with live SSE streams."""
+    return ThreadPoolExecutor(max_workers=4)
+
+
+@st.cache_data(ttl="10m", max_entries=32, show_spinner=False)
+def fetch_plot(plot_path: str) -> bytes:
+    """
+    Download the generated chart once per plot_path. Widget interactions
+    rerun the whole script — without this cache every rerun re-downloaded
+    the same PNG.
+    """
+    r = http().get(f"{BACKEND}/plot", timeout=10)
+    r.raise_for_status()
+    return r.content
+
+
+@st.cache_data(ttl="5m", max_entries=256, show_spinner=False)
+def ask_backend(question: str, session_key: str) -> dict:
+    """
+    Round-trip /ask at most once per (question, session). `session_key` is
+    only a cache salt — it is a fresh nonce per browser session, rotated on
+    every reconcile completion, so stale answers never outlive the dataset
+    they were grounded in (even when a same-named CSV is re-reconciled).
+    """
+    r = http().post(f"{BACKEND}/ask", json={"question": question}, timeout=60)
+    r.raise_for_status()
+    return r.json()
+
+
 # ── Sidebar ───────────────────────────────────────────────────────────────────
-st.sidebar.image(
-    "https://placehold.co/220x60/0e1117/7c3aed?text=⚡+Zenalyst",
-    use_column_width=True,
-)
+_LOGO_URL = "https://placehold.co/220x60/0e1117/7c3aed?text=⚡+Zenalyst"
+
+
+@st.cache_data(show_spinner=False)
+def _logo() -> bytes:
+    """Fetch the placeholder logo once per process, not once per session."""
+    r = http().get(_LOGO_URL, timeout=5)
+    r.raise_for_status()
+    return r.content
+
+
+try:
+    st.sidebar.image(_logo(), use_container_width=True)
+except Exception:
+    # Offline / placehold.co unreachable — let the browser try directly.
+    st.sidebar.image(_LOGO_URL, use_container_width=True)
+# Streamlit reruns the whole script on every widget interaction — results
+# live in session state so they survive reruns without re-hitting the backend.
+st.session_state.setdefault("recon_summary", None)
+st.session_state.setdefault("viz_plot_path", None)
+st.session_state.setdefault("recon_running", False)
+st.session_state.setdefault("recon_queue", None)
+# Only the newest thoughts are ever rendered — a bounded deque keeps the
+# window O(1) per append and stops the log outliving the run in memory.
+st.session_state.setdefault("recon_thoughts", deque(maxlen=12))
+# ask_backend's cache salt: unique per browser session, rotated whenever a
+# reconcile summary lands — the filename alone can't tell two uploads apart.
+st.session_state.setdefault("ask_salt", uuid.uuid4().hex)
+
+
+def _consume_reconcile(client: httpx.Client, uploaded, q: queue.Queue) -> None:
+    """
+    Worker-thread producer: drains the /reconcile SSE stream into a queue.
+
+    Runs off the Streamlit script thread so the UI stays interactive while
+    reconciliation streams; a run_every fragment drains the queue.
+    """
+    try:
+        with client.stream(
+            "POST",
+            f"{BACKEND}/reconcile",
+            files={"file": (uploaded.name, uploaded, "text/csv")},
+            headers={"Accept": "text/event-stream"},
+            timeout=180,
+        ) as resp:
+            for payload in _sse_events(resp):
+                q.put(payload)
+    except Exception as exc:
+        q.put({"type": "thought", "data": f"❌ Stream error: {exc}"})
+    finally:
+        q.put(None)   # sentinel — stream finished
+
 st.sidebar.title("Navigation")
 page = st.sidebar.radio(
     "Go to",
@@ -39,57 +192,79 @@ if page == "🔄 Reconcile":
 
     uploaded = st.file_uploader("Upload dirty financial CSV", type=["csv"])
 
-    if uploaded and st.button("🚀 Run Reconciliation", type="primary"):
-        col_l, col_r = st.columns([3, 2])
-
-        with col_l:
-            st.subheader("🧠 Live Thought Signatures")
-            thought_box = st.empty()
-            thoughts: list[str] = []
-
-        with col_r:
-            st.subheader("📊 Session Results")
-            metrics_box = st.empty()
-
-        summary_data = None
-
-        with requests.post(
-            f"{BACKEND}/reconcile",
-            files={"file": (uploaded.name, uploaded.getvalue(), "text/csv")},
-            stream=True,
-            timeout=180,
-        ) as resp:
-            for raw in resp.iter_lines():
-                if not raw:
-                    continue
-                line = raw.decode("utf-8")
-                if not line.startswith("data:"):
-                    continue
-                payload_str = line[5:].strip()
-                if payload_str == "[DONE]":
-                    break
+    col_l, col_r = st.columns([3, 2])
+
+    with col_r:
+        st.subheader("📊 Session Results")
+
+    # The button only starts the worker-thread consumer — the script thread
+    # returns immediately, so the sidebar and other fragments stay live
+    # while the pipeline streams.
+    if uploaded and st.button("🚀 Run Reconciliation", type="primary") \
+            and not st.session_state.recon_running:
+        q: queue.Queue = queue.Queue()
+        st.session_state.recon_queue    = q
+        st.session_state.recon_thoughts = deque(maxlen=12)
+        st.session_state.recon_summary  = None
+        st.session_state.recon_running  = True
+        # Hand the UploadedFile object itself to the client — it streams the
+        # multipart body chunk-by-chunk instead of materializing a full bytes
+        # copy of the CSV first (2x memory peak on large uploads).
+        uploaded.seek(0)
+        _prefetch_pool().submit(_consume_reconcile, http(), uploaded, q)
+
+    with col_l:
+        st.subheader("🧠 Live Thought Signatures")
+
+        # Timed fragment drains the queue every 300 ms while the stream is
+        # live; once the sentinel arrives it triggers one full rerun so the
+        # results block picks up the summary.
+        @st.fragment(run_every=0.3 if st.session_state.recon_running else None)
+        def _live_thoughts() -> None:
+            q = st.session_state.recon_queue
+            finished = False
+            while q is not None:
                 try:
-                    payload = json.loads(payload_str)
-                except Exception:
-                    continue
-
+                    payload = q.get_nowait()
+                except queue.Empty:
+                    break
+                if payload is None:
+                    finished = True
+                    break
                 if payload["type"] == "thought":
-                    thoughts.append(payload["data"])
-                    thought_box.markdown("\n\n---\n\n".join(thoughts[-12:]))
+                    st.session_state.recon_thoughts.append(payload["data"])
                 elif payload["type"] == "summary":
-                    summary_data = payload["data"]
-
-        if summary_data:
-            audit = summary_data.get("audit") or {}
-            with col_r:
-                metrics_box.empty()
-                st.metric("Original Rows",      summary_data.get("original_rows", "—"))
-                st.metric("Clean Rows",         summary_data.get("clean_rows", "—"))
-                st.metric("Duplicates Removed", summary_data.get("duplicates_removed", "—"))
-                status = audit.get("integrity_status", "—")
-                (st.success if status == "PASS" else st.warning)(f"ZenVault: {status}")
+                    st.session_state.recon_summary = payload["data"]
+                    # New dataset — rotate the /ask cache salt so answers
+                    # grounded in the previous frame are never replayed.
+                    st.session_state.ask_salt = uuid.uuid4().hex
+
+            if st.session_state.recon_thoughts:
+                st.markdown("\n\n---\n\n".join(st.session_state.recon_thoughts))
+            elif st.session_state.recon_running:
+                st.markdown("⏳ Waiting for the first thought…")
+
+            if finished:
+                st.session_state.recon_running = False
+                st.session_state.recon_queue   = None
+                st.rerun(scope="app")
+
+        _live_thoughts()
+
+    summary_data = st.session_state.recon_summary
+    if summary_data:
+        audit = summary_data.get("audit") or {}
+        with col_r:
+            # One columns row instead of three stacked st.metric calls —
+            # the results paint in a single delta after reconciliation.
+            c1, c2, c3 = st.columns(3)
+            c1.metric("Original Rows",      summary_data.get("original_rows", "—"))
+            c2.metric("Clean Rows",         summary_data.get("clean_rows", "—"))
+            c3.metric("Duplicates Removed", summary_data.get("duplicates_removed", "—"))
+            status = audit.get("integrity_status", "—")
+            (st.success if status == "PASS" else st.warning)(f"ZenVault: {status}")
 
-            st.success("✅ Reconciliation complete! Go to **Visualize** or **ZenChat**.")
+        st.success("✅ Reconciliation complete! Go to **Visualize** or **ZenChat**.")
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -99,59 +274,77 @@ elif page == "🎨 Visualize":
     st.title("🎨 ZenView — Deterministic Visualization Agent")
     st.caption("ZenView writes matplotlib/seaborn code. The sandbox executes it. No guessing.")
 
-    if st.button("🎨 Generate Chart", type="primary"):
-        col_l, col_r = st.columns([2, 3])
+    col_l, col_r = st.columns([2, 3])
 
-        with col_l:
-            st.subheader("🧠 Agent Thoughts")
-            thought_box = st.empty()
-            thoughts: list[str] = []
+    with col_l:
+        st.subheader("🧠 Agent Thoughts")
+        thought_slot = st.container()
 
-        with col_r:
-            st.subheader("📈 Generated Chart")
-            chart_box = st.empty()
-
-        plot_path = None
-
-        with requests.post(f"{BACKEND}/visualize", stream=True, timeout=120) as resp:
-            for raw in resp.iter_lines():
-                if not raw:
-                    continue
-                line = raw.decode("utf-8")
-                if not line.startswith("data:"):
-                    continue
-                payload_str = line[5:].strip()
-                if payload_str == "[DONE]":
-                    break
-                try:
-                    payload = json.loads(payload_str)
-                except Exception:
-                    continue
+    with col_r:
+        st.subheader("📈 Generated Chart")
+        chart_box = st.empty()
 
-                if payload["type"] == "thought":
-                    thoughts.append(payload["data"])
-                    thought_box.markdown("\n\n---\n\n".join(thoughts[-8:]))
-                elif payload["type"] == "viz_result":
-                    result = payload["data"]
-                    if result.get("success") and result.get("plot_path"):
-                        plot_path = result["plot_path"]
-
-        if plot_path:
-            img_resp = requests.get(f"{BACKEND}/plot", timeout=10)
-            if img_resp.status_code == 200:
-                with col_r:
-                    chart_box.image(img_resp.content, caption="ZenView Output", use_column_width=True)
-                    st.download_button(
-                        "⬇️ Download Chart",
-                        data=img_resp.content,
-                        file_name="zenview_chart.png",
-                        mime="image/png",
-                    )
-            else:
-                st.error("Chart generated but could not be fetched from backend.")
-        else:
+    if st.button("🎨 Generate Chart", type="primary"):
+        plot_path   = None
+        plot_future = None
+
+        # The backend always saves to the same reports path, so plot_path is
+        # a constant cache key — drop the cached bytes up front or the
+        # prefetch below would serve the previous run's PNG.
+        fetch_plot.clear()
+
+        with http().stream(
+            "POST",
+            f"{BACKEND}/visualize",
+            headers={"Accept": "text/event-stream"},
+            timeout=120,
+        ) as resp:
+            with thought_slot, st.status("ZenView is working…", expanded=True) as status:
+                for payload in _sse_events(resp):
+                    if payload["type"] == "thought":
+                        st.write(payload["data"])
+                    elif payload["type"] == "viz_result":
+                        result = payload["data"]
+                        if result.get("success") and result.get("plot_path"):
+                            plot_path = result["plot_path"]
+                            # The backend emits viz_result before [DONE] —
+                            # start the PNG download now so it rides behind
+                            # the rest of the thought stream.
+                            plot_future = _prefetch_pool().submit(fetch_plot, plot_path)
+                status.update(
+                    label="Chart generated" if plot_path else "Chart generation failed",
+                    state="complete" if plot_path else "error",
+                )
+
+        if plot_future is not None:
+            try:
+                plot_future.result(timeout=10)   # warms fetch_plot's cache
+            except Exception:
+                pass
+
+        st.session_state.viz_plot_path = plot_path
+        if not plot_path:
             st.error("ZenView could not generate a chart. Check the thought log above.")
 
+    # Rendered from session state — the chart and its download button survive
+    # reruns (fetch_plot serves the bytes from its cache, no re-download).
+    if st.session_state.viz_plot_path:
+        try:
+            img_bytes = fetch_plot(st.session_state.viz_plot_path)
+        except Exception:
+            img_bytes = None
+        if img_bytes:
+            with col_r:
+                chart_box.image(img_bytes, caption="ZenView Output", use_container_width=True)
+                st.download_button(
+                    "⬇️ Download Chart",
+                    data=img_bytes,
+                    file_name="zenview_chart.png",
+                    mime="image/png",
+                )
+        else:
+            st.error("Chart generated but could not be fetched from backend.")
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Page 3 — ZenChat
@@ -163,14 +356,21 @@ elif page == "💬 ZenChat":
         "Answers are grounded in real data — no hallucinations."
     )
 
-    # Conversation history in session state
+    # Conversation history in session state — bounded so a long-running
+    # session can't grow render cost and memory without limit.
     if "chat_history" not in st.session_state:
-        st.session_state.chat_history = []
+        st.session_state.chat_history = deque(maxlen=200)
+
+    # Render conversation inside a fragment — only this block reruns when
+    # the history changes, so sidebar/navigation interactions don't re-walk
+    # and repaint every past message.
+    @st.fragment
+    def _render_chat() -> None:
+        for msg in st.session_state.chat_history:
+            with st.chat_message(msg["role"]):
+                st.markdown(msg["content"])
 
-    # Render conversation
-    for msg in st.session_state.chat_history:
-        with st.chat_message(msg["role"]):
-            st.markdown(msg["content"])
+    _render_chat()
 
     # Suggested starter questions
     if not st.session_state.chat_history:
@@ -191,13 +391,7 @@ elif page == "💬 ZenChat":
         with st.chat_message("assistant"):
             with st.spinner("ZenChat is thinking…"):
                 try:
-                    resp = requests.post(
-                        f"{BACKEND}/ask",
-                        json={"question": question},
-                        timeout=60,
-                    )
-                    resp.raise_for_status()
-                    data = resp.json()
+                    data = ask_backend(question, st.session_state.ask_salt)
                     answer = data.get("answer", "No answer returned.")
                     grounded = data.get("grounded", False)
 
@@ -211,7 +405,7 @@ elif page == "💬 ZenChat":
                     else:
                         st.warning("⚠️ No session data — reconcile a CSV first.")
 
-                except requests.exceptions.RequestException as exc:
+                except httpx.HTTPError as exc:
                     answer = f"❌ Backend error: {exc}"
                     st.error(answer)
 
@@ -220,5 +414,5 @@ elif page == "💬 ZenChat":
     # Clear chat button
     if st.session_state.chat_history:
         if st.button("🗑️ Clear chat"):
-            st.session_state.chat_history = []
+            st.session_state.chat_history.clear()
             st.rerun()
\ No newline at end of file